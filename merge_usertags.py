@@ -7,18 +7,47 @@ Handles different file formats and deduplicates users across files.
 
 import json
 import os
+import re
 import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from typing import Dict, Iterator, List, Any, Set, Tuple
 import argparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Picks the fastest installed backend (yajl2_c when available)
+    import ijson
+except ImportError:
+    ijson = None
+
+# Strips HTML/rich-text markup such as <color=#fff> from tag text
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+DEFAULT_FOREGROUND_RGB = b'\xff\x00\x00'  # Default red color
+
 
 class UserTagsMerger:
     def __init__(self, input_dir: str = ".", output_file: str = "usertags.json"):
         self.input_dir = Path(input_dir)
         self.output_file = Path(output_file)
-        self.merged_data = {}
-        self.user_ids_seen: Set[str] = set()
+        # Merged users are stored column-wise, one entry per user at the index in _index
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._record_ids: List[Any] = []
+        self._active = array('B')
+        self._malicious = array('B')
+        self._tags: List[List[str]] = []
+        self._tag_sets: List[Set[str]] = []
+        self._main_tags: List[str] = []
+        self._colors = bytearray()  # 3 RGB bytes per user
+        self._sources: List[List[str]] = []
+        self._source_sets: List[Set[str]] = []
         self.stats = {
             "files_processed": 0,
             "total_records": 0,
@@ -29,6 +58,8 @@ class UserTagsMerger:
     def load_json_file(self, file_path: Path) -> Dict[str, Any]:
         """Load and parse a JSON file."""
         try:
+            if orjson is not None:
+                return orjson.loads(file_path.read_bytes())
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except json.JSONDecodeError as e:
@@ -90,22 +121,25 @@ class UserTagsMerger:
         
         return filtered_tags
 
+    def extract_foreground_rgb(self, record: Dict[str, Any]) -> bytes:
+        """Extract foreground color from Color array as raw RGB bytes."""
+        if 'Color' in record and isinstance(record['Color'], list) and len(record['Color']) >= 3:
+            try:
+                return bytes(record['Color'][:3])
+            except (TypeError, ValueError):
+                pass
+        return DEFAULT_FOREGROUND_RGB
+
     def extract_foreground_color(self, record: Dict[str, Any]) -> str:
         """Extract foreground color from Color array or other fields."""
-        if 'Color' in record and isinstance(record['Color'], list) and len(record['Color']) >= 3:
-            # Convert RGB values to hex
-            r, g, b = record['Color'][:3]
-            return f"#{r:02x}{g:02x}{b:02x}"
-        return "#ff0000"  # Default red color
+        return "#" + self.extract_foreground_rgb(record).hex()
 
     def extract_main_tag(self, tags: List[str]) -> str:
         """Extract a main tag from the list of tags (first non-empty tag, cleaned)."""
         for tag in tags:
             if tag and str(tag).strip():
                 # Remove HTML tags and color codes for a clean main tag
-                import re
-                clean_tag = re.sub(r'<[^>]+>', '', tag)
-                clean_tag = clean_tag.strip()
+                clean_tag = _HTML_TAG_RE.sub('', tag).strip()
                 if clean_tag:
                     return clean_tag
         return "User"
@@ -121,60 +155,122 @@ class UserTagsMerger:
             return
         
         # Check if we've seen this user before
-        if user_id in self.user_ids_seen:
-            # Merge tags, avoiding duplicates based on text content
-            existing_tags = self.merged_data[user_id].get('tags', [])
-            existing_tag_texts = set(existing_tags)
-            
-            for tag_obj in tag_objects:
-                tag_text = tag_obj['text']
-                if tag_text not in existing_tag_texts:
-                    existing_tags.append(tag_text)
-                    existing_tag_texts.add(tag_text)
-            
-            # Add source to sources list if not already present
-            sources = self.merged_data[user_id].get('sources', [])
-            if source_file not in sources:
-                sources.append(source_file)
-            self.merged_data[user_id]['sources'] = sources
-            
-            self.merged_data[user_id]['tags'] = existing_tags
+        tag_texts = [tag_obj['text'] for tag_obj in tag_objects]
+        index = self._index.get(user_id)
+        if index is not None:
+            self._merge_into(index, tag_texts, [source_file])
             self.stats["duplicates_merged"] += 1
         else:
             # Create new record with UserID as key
-            tag_texts = [tag_obj['text'] for tag_obj in tag_objects]
-            
-            new_record = {
-                "id": record.get('id', 0),
-                "active": record.get('Active', True),
-                "malicious": record.get('Malicious', False),
-                "tags": tag_texts,
-                "tag": self.extract_main_tag(tag_texts),
-                "foreground_color": self.extract_foreground_color(record),
-                "sources": [source_file]
-            }
-            
-            self.merged_data[user_id] = new_record
-            self.user_ids_seen.add(user_id)
+            self._add_user(
+                user_id,
+                record.get('id', 0),
+                record.get('Active', True),
+                record.get('Malicious', False),
+                tag_texts,
+                self.extract_main_tag(tag_texts),
+                self.extract_foreground_rgb(record),
+                [source_file]
+            )
             self.stats["unique_users"] += 1
         
         self.stats["total_records"] += 1
 
+    def _add_user(self, user_id: str, record_id: Any, active: bool, malicious: bool,
+                  tags: List[str], main_tag: str, rgb: bytes, sources: List[str]) -> None:
+        """Append a new user to the merged columns."""
+        self._index[user_id] = len(self._ids)
+        self._ids.append(user_id)
+        self._record_ids.append(record_id)
+        self._active.append(1 if active else 0)
+        self._malicious.append(1 if malicious else 0)
+        self._tags.append(tags)
+        self._tag_sets.append(set(tags))
+        self._main_tags.append(main_tag)
+        self._colors += rgb
+        self._sources.append(sources)
+        self._source_sets.append(set(sources))
+
+    def _merge_into(self, index: int, tags: List[str], sources: List[str]) -> None:
+        """Merge tags and sources into an already-seen user."""
+        # Merge tags, avoiding duplicates based on text content
+        existing_tags = self._tags[index]
+        tag_set = self._tag_sets[index]
+        for tag_text in tags:
+            if tag_text not in tag_set:
+                tag_set.add(tag_text)
+                existing_tags.append(tag_text)
+        
+        # Add sources to sources list if not already present
+        existing_sources = self._sources[index]
+        source_set = self._source_sets[index]
+        for source_file in sources:
+            if source_file not in source_set:
+                source_set.add(source_file)
+                existing_sources.append(source_file)
+
+    def _export_partial(self) -> Dict[str, Tuple]:
+        """Export merged users as picklable tuples for _merge_partial."""
+        return {
+            user_id: (
+                self._record_ids[i],
+                bool(self._active[i]),
+                bool(self._malicious[i]),
+                self._tags[i],
+                self._main_tags[i],
+                bytes(self._colors[3 * i:3 * i + 3]),
+                self._sources[i]
+            )
+            for i, user_id in enumerate(self._ids)
+        }
+
+    def _merge_partial(self, partial: Dict[str, Tuple], stats: Dict[str, int]) -> None:
+        """Merge users parsed from one file by _parse_file."""
+        new_users = 0
+        for user_id, (record_id, active, malicious, tags, main_tag, rgb, sources) in partial.items():
+            index = self._index.get(user_id)
+            if index is not None:
+                self._merge_into(index, tags, sources)
+            else:
+                self._add_user(user_id, record_id, active, malicious, tags, main_tag, rgb, sources)
+                new_users += 1
+        
+        # Every record that didn't introduce a new user was merged into an existing one
+        self.stats["files_processed"] += stats["files_processed"]
+        self.stats["total_records"] += stats["total_records"]
+        self.stats["unique_users"] += new_users
+        self.stats["duplicates_merged"] += stats["total_records"] - new_users
+
+    def iter_records(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield the records of a JSON file, streaming them when ijson is installed."""
+        if ijson is None:
+            data = self.load_json_file(file_path)
+            if isinstance(data, dict) and isinstance(data.get('records'), list):
+                yield from data['records']
+            return
+        
+        try:
+            with open(file_path, 'rb') as f:
+                yield from ijson.items(f, 'records.item', use_float=True)
+        except ijson.JSONError as e:
+            print(f"Error parsing {file_path}: {e}")
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+
     def process_file(self, file_path: Path) -> None:
         """Process a single JSON file."""
         print(f"Processing {file_path.name}...")
         
-        data = self.load_json_file(file_path)
-        if not data or 'records' not in data:
+        record_count = 0
+        for record in self.iter_records(file_path):
+            self.merge_record(record, file_path.name)
+            record_count += 1
+        
+        if not record_count:
             print(f"  No valid records found in {file_path.name}")
             return
         
-        records = data['records']
-        print(f"  Found {len(records)} records")
-        
-        for record in records:
-            self.merge_record(record, file_path.name)
-        
+        print(f"  Found {record_count} records")
         self.stats["files_processed"] += 1
 
     def merge_all_files(self) -> None:
@@ -194,9 +290,12 @@ class UserTagsMerger:
         # Exclude generated files and the output file
         excluded_files = {self.output_file.name, 'usertags.json', 'usertags2.json', 'usertags_new.json', 'usertags_final.json'}
         
-        for file_path in json_files:
-            if file_path.name not in excluded_files:
-                self.process_file(file_path)
+        files_to_merge = [file_path for file_path in json_files if file_path.name not in excluded_files]
+        
+        # Parse files in parallel, then merge the results in file order
+        with ProcessPoolExecutor() as executor:
+            for partial, stats in executor.map(_parse_file, files_to_merge):
+                self._merge_partial(partial, stats)
         
         print(f"\nMerge completed!")
         print(f"Files processed: {self.stats['files_processed']}")
@@ -204,13 +303,38 @@ class UserTagsMerger:
         print(f"Unique users: {self.stats['unique_users']}")
         print(f"Duplicates merged: {self.stats['duplicates_merged']}")
 
+    @property
+    def merged_data(self) -> Dict[str, Dict[str, Any]]:
+        """Build the merged records, keyed by UserID."""
+        # Hex-encode every color in one pass, 6 hex digits per user
+        hex_colors = self._colors.hex()
+        return {
+            user_id: {
+                "id": self._record_ids[i],
+                "active": bool(self._active[i]),
+                "malicious": bool(self._malicious[i]),
+                "tags": self._tags[i],
+                "tag": self._main_tags[i],
+                "foreground_color": "#" + hex_colors[6 * i:6 * i + 6],
+                "sources": self._sources[i]
+            }
+            for i, user_id in enumerate(self._ids)
+        }
+
     def save_merged_data(self) -> None:
         """Save the merged data to the output file."""
+        merged_data = self.merged_data
+        
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.merged_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                self.output_file.write_bytes(
+                    orjson.dumps(merged_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                )
+            else:
+                with open(self.output_file, 'w', encoding='utf-8') as f:
+                    json.dump(merged_data, f, indent=2, ensure_ascii=False)
             print(f"\nMerged data saved to {self.output_file}")
-            print(f"Total records in output: {len(self.merged_data)}")
+            print(f"Total records in output: {len(merged_data)}")
         except Exception as e:
             print(f"Error saving merged data: {e}")
 
@@ -227,6 +351,13 @@ class UserTagsMerger:
         self.save_merged_data()
 
 
+def _parse_file(file_path: Path) -> Tuple[Dict[str, Tuple], Dict[str, int]]:
+    """Parse a single JSON file into merge-ready users (runs in a worker process)."""
+    merger = UserTagsMerger()
+    merger.process_file(file_path)
+    return merger._export_partial(), merger.stats
+
+
 def main():
     parser = argparse.ArgumentParser(description="Merge JSON tag files into one comprehensive usertags.json")
     parser.add_argument("--input-dir", "-i", default=".", 
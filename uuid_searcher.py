@@ -5,75 +5,141 @@ Uses async I/O and multithreading for optimal performance
 """
 
 import asyncio
+import ctypes
+import mmap
 import os
 import re
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Set, Tuple
+from typing import Iterator, List, Set, Tuple
 import time
 import sys
 
 # UUID pattern: usr_ followed by standard UUID format
 UUID_PATTERN = re.compile(rb'usr_[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
 
+# Use a Hyperscan DFA for the scan when the bindings are installed
+try:
+    import hyperscan
+    HS_DATABASE = hyperscan.Database()
+    HS_DATABASE.compile(
+        expressions=[UUID_PATTERN.pattern],
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST]
+    )
+except ImportError:
+    HS_DATABASE = None
+
+# Length of a usr_ UUID match
+UUID_LENGTH = 40
+
+# Largest slice handed to one Hyperscan scan (its length argument is 32-bit)
+HS_SCAN_WINDOW = 1 << 30
+
+# Hyperscan scratch space can't be shared between concurrent scans, so each thread gets its own
+_hs_local = threading.local()
+
+# GetDriveTypeW result for local hard disks
+DRIVE_FIXED = 3
+
+# Compressed/binary formats that can't contain a literal usr_ UUID
+SKIP_EXTENSIONS = {
+    '.zip', '.7z', '.gz', '.xz', '.png', '.jpg', '.jpeg', '.mp4', '.mkv',
+    '.exe', '.dll', '.pdb', '.iso', '.vhd', '.vhdx', '.sys', '.bin'
+}
+
+# Size bounds for files worth scanning (a usr_ UUID is 40 bytes)
+MIN_FILE_SIZE = 16
+MAX_FILE_SIZE = 10 * 1024 * 1024 * 1024  # 10GB
+
+# Buffered output is flushed to disk once it grows past this size
+OUTPUT_FLUSH_SIZE = 64 * 1024
+
+# Number of lock/set shards for deduplicating found UUIDs (power of two)
+SHARD_COUNT = 16
+
+# Files below this size are read directly, mmap setup costs more than it saves
+MMAP_MIN_SIZE = 64 * 1024
+
 class UUIDSearcher:
-    def __init__(self, max_workers: int = None, chunk_size: int = 1024 * 1024):  # 1MB chunks
+    def __init__(self, max_workers: int = None):
         self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
-        self.chunk_size = chunk_size
         self.found_uuids: Set[bytes] = set()
         self.lock = threading.Lock()
         self.processed_files = 0
         self.total_files = 0
         self.output_file = None
-        self.written_uuids: Set[str] = set()
+        # Dedup state is split into shards so threads rarely wait on each other;
+        # self.lock only guards the shared output file
+        self._shard_locks = [threading.Lock() for _ in range(SHARD_COUNT)]
+        self._written_shards: List[Set[str]] = [set() for _ in range(SHARD_COUNT)]
+        self._out_bufs = [bytearray() for _ in range(SHARD_COUNT)]
+        self._out_fh = None
         
     def get_local_drives(self) -> List[Path]:
         """Get all local drives on Windows"""
+        if not hasattr(ctypes, 'windll'):
+            return []
+        
+        kernel32 = ctypes.windll.kernel32
+        drive_mask = kernel32.GetLogicalDrives()
         drives = []
-        for drive_letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-            drive_path = Path(f"{drive_letter}:\\")
-            if drive_path.exists() and drive_path.is_dir():
-                try:
-                    # Check if it's a local drive (not network, removable, etc.)
-                    drive_type = os.system(f'wmic logicaldisk where "DeviceID=\'{drive_letter}:\'" get DriveType /value 2>nul')
-                    drives.append(drive_path)
-                except:
-                    drives.append(drive_path)
+        for i in range(26):
+            if drive_mask & (1 << i):
+                drive_root = f"{chr(ord('A') + i)}:\\"
+                # Only keep fixed local disks (not network, removable, etc.)
+                if kernel32.GetDriveTypeW(drive_root) == DRIVE_FIXED:
+                    drives.append(Path(drive_root))
         return drives
     
-    def is_huge_file(self, file_path: Path) -> bool:
-        """Check if file is over 10GB"""
-        try:
-            return file_path.stat().st_size > 10 * 1024 * 1024 * 1024  # 10GB
-        except:
-            return True
+    def find_uuids(self, data) -> List[bytes]:
+        """Find all UUID patterns in a bytes-like buffer"""
+        if HS_DATABASE is None:
+            return UUID_PATTERN.findall(data)
+        
+        scratch = getattr(_hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = _hs_local.scratch = hyperscan.Scratch(HS_DATABASE)
+        
+        matches = []
+        # Block-mode scans take a 32-bit length, so larger buffers are scanned in windows
+        # overlapping by one byte less than a UUID: seam matches are seen once, never twice
+        step = HS_SCAN_WINDOW - (UUID_LENGTH - 1)
+        with memoryview(data) as view:
+            for offset in range(0, len(view), step):
+                with view[offset:offset + HS_SCAN_WINDOW] as window:
+                    HS_DATABASE.scan(
+                        window,
+                        match_event_handler=lambda pattern_id, start, end, flags, context: context.append(bytes(window[start:end])),
+                        context=matches,
+                        scratch=scratch
+                    )
+                if offset + HS_SCAN_WINDOW >= len(view):
+                    break
+        return matches
     
     def search_file_for_uuids(self, file_path: Path) -> List[bytes]:
         """Search a single file for UUID patterns"""
         found_uuids = []
         
         try:
-            # Skip huge files (>10GB) to avoid memory issues
-            if self.is_huge_file(file_path):
+            # Skip empty and huge files (>10GB) to avoid memory issues
+            size = file_path.stat().st_size
+            if size == 0 or size > MAX_FILE_SIZE:
                 return found_uuids
                 
             with open(file_path, 'rb') as f:
-                # Read file in chunks to handle large files
-                while True:
-                    chunk = f.read(self.chunk_size)
-                    if not chunk:
-                        break
-                    
-                    # Search for UUID pattern in chunk
-                    matches = UUID_PATTERN.findall(chunk)
-                    found_uuids.extend(matches)
-                    
-                    # If we found matches, we can break early
-                    if matches:
-                        break
+                if size < MMAP_MIN_SIZE:
+                    return self.find_uuids(f.read())
+                
+                # Scan the whole file in one pass, pages are faulted in on demand
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Let the kernel read ahead aggressively where supported (not on Windows)
+                    if hasattr(mm, 'madvise'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    return self.find_uuids(mm)
                         
-        except (PermissionError, OSError, MemoryError):
+        except (PermissionError, OSError, MemoryError, ValueError):
             # Skip files we can't read
             pass
         except Exception as e:
@@ -81,6 +147,37 @@ class UUIDSearcher:
             
         return found_uuids
     
+    def _open_output(self, output_file: str = "user_ids.txt"):
+        """Open the output file for buffered appends"""
+        self.output_file = output_file
+        self._out_fh = open(output_file, 'ab')
+    
+    def _flush_output(self, shard: int, output_file: str = "user_ids.txt"):
+        """Write a shard's buffered UUIDs to the output file (caller holds the shard lock)"""
+        buf = self._out_bufs[shard]
+        if not buf:
+            return
+        with self.lock:
+            if self._out_fh is None:
+                self._open_output(output_file)
+            self._out_fh.write(buf)
+        buf.clear()
+    
+    def _close_output(self):
+        """Flush remaining UUIDs and close the output file"""
+        for shard, shard_lock in enumerate(self._shard_locks):
+            with shard_lock:
+                self._flush_output(shard)
+        with self.lock:
+            if self._out_fh:
+                self._out_fh.close()
+                self._out_fh = None
+    
+    @property
+    def written_uuids(self) -> Set[str]:
+        """All UUIDs written so far"""
+        return set().union(*self._written_shards)
+    
     def write_uuid_to_file(self, uuid_bytes: bytes, output_file: str = "user_ids.txt"):
         """Write a UUID to file if it hasn't been written before"""
         # Convert bytes to string and remove 'usr_' prefix
@@ -88,45 +185,59 @@ class UUIDSearcher:
         # if uuid_str.startswith('usr_'):
         #     uuid_str = uuid_str[4:]  # Remove 'usr_' prefix
         
-        with self.lock:
-            # Check if we've already written this UUID
-            if uuid_str not in self.written_uuids:
-                self.written_uuids.add(uuid_str)
-                
-                # Open file in append mode and write the UUID
-                with open(output_file, 'a', encoding='utf-8') as f:
-                    f.write(f"{uuid_str}\n")
+        shard = hash(uuid_str) & (SHARD_COUNT - 1)
+        written = self._written_shards[shard]
+        
+        # Set lookups are safe without the lock under the GIL
+        if uuid_str in written:
+            return
+        
+        with self._shard_locks[shard]:
+            # Check again, another thread may have written it meanwhile
+            if uuid_str in written:
+                return
+            written.add(uuid_str)
+            
+            # Buffer the UUID and only hit the disk once the buffer is full
+            buf = self._out_bufs[shard]
+            buf += f"{uuid_str}\n".encode('utf-8')
+            if len(buf) > OUTPUT_FLUSH_SIZE:
+                self._flush_output(shard, output_file)
     
-    def process_directory(self, directory: Path) -> List[Path]:
-        """Get all files in a directory (recursively)"""
-        files = []
-        try:
-            for item in directory.rglob('*'):
-                if item.is_file():
-                    files.append(item)
-        except (PermissionError, OSError):
-            # Skip directories we can't access
-            pass
-        return files
+    def process_directory(self, directory: Path) -> Iterator[Path]:
+        """Yield all scannable files in a directory (recursively)"""
+        pending = [directory]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file():
+                                if os.path.splitext(entry.name)[1].lower() in SKIP_EXTENSIONS:
+                                    continue
+                                if MIN_FILE_SIZE <= entry.stat().st_size <= MAX_FILE_SIZE:
+                                    yield Path(entry.path)
+                        except OSError:
+                            continue
+            except (PermissionError, OSError):
+                # Skip directories we can't access
+                pass
     
     def search_drive(self, drive_path: Path) -> List[bytes]:
         """Search all files on a single drive"""
         print(f"Scanning drive {drive_path}...")
         drive_uuids = []
         
-        # Get all files on the drive
-        all_files = self.process_directory(drive_path)
-        self.total_files += len(all_files)
-        
-        print(f"Found {len(all_files)} files on {drive_path}")
-        
-        # Process files in parallel
+        # Process files in parallel, submitting them while the drive is still being walked
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all file search tasks
-            future_to_file = {
-                executor.submit(self.search_file_for_uuids, file_path): file_path 
-                for file_path in all_files
-            }
+            future_to_file = {}
+            for file_path in self.process_directory(drive_path):
+                future_to_file[executor.submit(self.search_file_for_uuids, file_path)] = file_path
+                self.total_files += 1
+            
+            print(f"Found {len(future_to_file)} files on {drive_path}")
             
             # Collect results as they complete
             for future in as_completed(future_to_file):
@@ -141,7 +252,7 @@ class UUIDSearcher:
                         
                     self.processed_files += 1
                     if self.processed_files % 1000 == 0:
-                        print(f"Processed {self.processed_files}/{self.total_files} files... Found {len(self.written_uuids)} unique UUIDs so far...")
+                        print(f"Processed {self.processed_files}/{self.total_files} files... Found {self.get_final_count()} unique UUIDs so far...")
                         
                 except Exception as e:
                     print(f"Error processing {file_path}: {e}")
@@ -154,24 +265,29 @@ class UUIDSearcher:
         print(f"Found {len(drives)} local drives: {[str(d) for d in drives]}")
         
         all_uuids = set()
+        self._open_output()
         
-        # Process all drives in parallel
-        with ThreadPoolExecutor(max_workers=len(drives)) as executor:
-            # Submit all drive search tasks
-            future_to_drive = {
-                executor.submit(self.search_drive, drive): drive 
-                for drive in drives
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_drive):
-                drive = future_to_drive[future]
-                try:
-                    drive_uuids = future.result()
-                    all_uuids.update(drive_uuids)
-                    print(f"Completed scanning {drive} - Found {len(drive_uuids)} UUIDs")
-                except Exception as e:
-                    print(f"Error scanning drive {drive}: {e}")
+        try:
+            # Process all drives in parallel
+            with ThreadPoolExecutor(max_workers=len(drives)) as executor:
+                # Submit all drive search tasks
+                future_to_drive = {
+                    executor.submit(self.search_drive, drive): drive 
+                    for drive in drives
+                }
+                
+                # Collect results as they complete
+                for future in as_completed(future_to_drive):
+                    drive = future_to_drive[future]
+                    try:
+                        drive_uuids = future.result()
+                        all_uuids.update(drive_uuids)
+                        print(f"Completed scanning {drive} - Found {len(drive_uuids)} UUIDs")
+                    except Exception as e:
+                        print(f"Error scanning drive {drive}: {e}")
+        finally:
+            # Flush buffered UUIDs even when interrupted
+            self._close_output()
         
         return all_uuids
     
@@ -183,7 +299,7 @@ class UUIDSearcher:
     
     def get_final_count(self, output_file: str = "user_ids.txt"):
         """Get the final count of written UUIDs"""
-        return len(self.written_uuids)
+        return sum(len(written) for written in self._written_shards)
 
 def main():
     print("UUID Searcher - Searching all local drives for usr_ UUID patterns")
@@ -5,15 +5,31 @@ Checks user IDs against the yoinker detection service with 404 tracking
 """
 
 import hashlib
+import importlib.util
 import json
 import csv
 import asyncio
-import aiohttp
-from datetime import datetime, timedelta, UTC
+import httpx
+import time
 from typing import Optional, Dict, Set, List
 import argparse
 import os
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Skip hashlib's constructor dispatch and go straight to OpenSSL
+    from _hashlib import openssl_sha256 as _sha256
+except ImportError:
+    _sha256 = hashlib.sha256
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
 class YoinkerDetector:
@@ -26,23 +42,25 @@ class YoinkerDetector:
         self.cache: Dict[str, Dict] = {}
         self.request_count = 0
         self.max_requests_per_minute = 15
+        self._cached_files: Set[str] = set()
+        self._io_pool: Optional[ThreadPoolExecutor] = None
     
     def _generate_hash(self, user_id: str) -> str:
         """Generate SHA256 hash of user ID"""
-        return hashlib.sha256(user_id.encode('utf-8')).hexdigest()
+        return _sha256(user_id.encode('utf-8')).digest().hex()
     
     def _check_rate_limit(self) -> bool:
         """Simple rate limiting: 15 requests per 60 seconds"""
-        now = datetime.now(UTC)
+        now = time.monotonic()
         # Remove old requests (older than 60 seconds)
-        while self.rate_limit_queue and (now - self.rate_limit_queue[0]).total_seconds() > 60:
+        while self.rate_limit_queue and now - self.rate_limit_queue[0] > 60:
             self.rate_limit_queue.popleft()
         
         return len(self.rate_limit_queue) < self.max_requests_per_minute
     
     def _record_request(self):
         """Record a request for rate limiting"""
-        self.rate_limit_queue.append(datetime.now(UTC))
+        self.rate_limit_queue.append(time.monotonic())
     
     def _load_404s(self) -> Set[str]:
         """Load existing 404 user IDs"""
@@ -52,7 +70,7 @@ class YoinkerDetector:
         
         try:
             with open(not_found_file, 'r', encoding='utf-8') as f:
-                return {line.strip() for line in f if line.strip()}
+                return set(f.read().split())
         except Exception as e:
             print(f"Error reading {not_found_file}: {e}")
             return set()
@@ -65,13 +83,12 @@ class YoinkerDetector:
         not_found_file = "404.txt"
         try:
             with open(not_found_file, 'a', encoding='utf-8') as f:
-                for user_id in new_404s:
-                    f.write(f"{user_id}\n")
+                f.write('\n'.join(new_404s) + '\n')
             print(f"Added {len(new_404s)} new 404s to {not_found_file}")
         except Exception as e:
             print(f"Error saving 404s: {e}")
     
-    async def _check_user(self, session: aiohttp.ClientSession, user_id: str) -> Optional[Dict]:
+    async def _check_user(self, client: httpx.AsyncClient, user_id: str, user_hash: Optional[str] = None) -> Optional[Dict]:
         """Check a single user ID"""
         # Check cache first
         if user_id in self.cache:
@@ -79,7 +96,7 @@ class YoinkerDetector:
         
         # Check for existing JSON file
         json_file = f"yoinkers/{user_id}.json"
-        if os.path.exists(json_file):
+        if f"{user_id}.json" in self._cached_files:
             try:
                 with open(json_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
@@ -92,53 +109,70 @@ class YoinkerDetector:
         while not self._check_rate_limit():
             await asyncio.sleep(1)
         
-        user_hash = self._generate_hash(user_id)
+        if user_hash is None:
+            user_hash = self._generate_hash(user_id)
         url = f"{self.base_url}{user_hash}"
         
         try:
-            async with session.get(url, timeout=30) as response:
-                self._record_request()
-                
-                if response.status == 404:
-                    result = {"_404": True, "userId": user_id}
-                    self.cache[user_id] = result
-                    return result
-                
-                elif response.status == 200:
-                    data = await response.json()
-                    if data.get('isYoinker', False):
-                        self.cache[user_id] = data
-                        return data
-                    else:
-                        self.cache[user_id] = None
-                        return None
-                
-                elif response.status == 429:
-                    print(f"Rate limited, waiting...")
-                    await asyncio.sleep(60)
-                    return await self._check_user(session, user_id)
-                
+            response = await client.get(url)
+            self._record_request()
+            
+            if response.status_code == 404:
+                result = {"_404": True, "userId": user_id}
+                self.cache[user_id] = result
+                return result
+            
+            elif response.status_code == 200:
+                data = response.json()
+                if data.get('isYoinker', False):
+                    self.cache[user_id] = data
+                    return data
                 else:
-                    print(f"HTTP {response.status} for {user_id}")
+                    self.cache[user_id] = None
                     return None
-                    
+            
+            elif response.status_code == 429:
+                print(f"Rate limited, waiting...")
+                await asyncio.sleep(60)
+                return await self._check_user(client, user_id, user_hash)
+            
+            else:
+                print(f"HTTP {response.status_code} for {user_id}")
+                return None
+                
         except Exception as e:
             print(f"Error checking {user_id}: {e}")
             return None
     
+    def _write_json_file(self, json_file: str, payload: bytes):
+        """Write serialized JSON to disk"""
+        try:
+            with open(json_file, 'wb') as f:
+                f.write(payload)
+        except Exception as e:
+            print(f"Error saving JSON to {json_file}: {e}")
+    
     def _save_json(self, user_id: str, data: Optional[Dict], save_empty: bool):
         """Save JSON response if needed"""
         if not data or data.get('_404'):
             return
         
-        os.makedirs("yoinkers", exist_ok=True)
         json_file = f"yoinkers/{user_id}.json"
         
         try:
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
         except Exception as e:
             print(f"Error saving JSON for {user_id}: {e}")
+            return
+        
+        # Write off the event loop thread when the I/O pool is running
+        if self._io_pool is not None:
+            self._io_pool.submit(self._write_json_file, json_file, payload)
+        else:
+            self._write_json_file(json_file, payload)
     
     async def process_user_ids(self, input_file: str, output_file: str, save_empty: bool = False):
         """Main processing function"""
@@ -162,52 +196,96 @@ class YoinkerDetector:
             print(f"Skipped {skipped} known 404s")
         print(f"Processing {len(user_ids)} user IDs")
         
+        # List saved responses once instead of a stat per user
+        os.makedirs("yoinkers", exist_ok=True)
+        self._cached_files = set(os.listdir("yoinkers"))
+        
+        # Hash all IDs in one tight pass before the async loop
+        user_hashes = [self._generate_hash(uid) for uid in user_ids]
+        
         # Track results
         results = []
         new_404s = set()
-        semaphore = asyncio.Semaphore(self.max_concurrent)
         
-        async def process_user(user_id: str):
-            async with semaphore:
-                return await self._check_user(session, user_id)
+        # Bounded worker pool: only max_concurrent checks and a small backlog are in flight
+        in_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent * 4)
+        out_queue: asyncio.Queue = asyncio.Queue()
+        
+        async def producer():
+            for item in zip(user_ids, user_hashes):
+                await in_queue.put(item)
+            for _ in range(self.max_concurrent):
+                await in_queue.put(None)
+        
+        async def worker():
+            try:
+                while True:
+                    item = await in_queue.get()
+                    if item is None:
+                        return
+                    user_id, user_hash = item
+                    await out_queue.put((user_id, await self._check_user(client, user_id, user_hash)))
+            finally:
+                # Tell the consumer this worker is done
+                await out_queue.put(None)
         
         # Process users
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20)
-        timeout = aiohttp.ClientTimeout(total=30)
-        
-        async with aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers={'User-Agent': 'YoinkerDetector'}
-        ) as session:
-            
-            tasks = [process_user(uid) for uid in user_ids]
-            
-            for i, coro in enumerate(asyncio.as_completed(tasks)):
-                result = await coro
-                user_id = user_ids[i]
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        
+        self._io_pool = ThreadPoolExecutor(max_workers=4)
+        
+        try:
+            # HTTP/2 multiplexes every request over one connection to the service
+            async with httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=limits,
+                timeout=30.0,
+                headers={'User-Agent': 'YoinkerDetector'}
+            ) as client:
                 
-                if result and result.get('_404'):
-                    new_404s.add(user_id)
-                    print(f"[{i+1}/{len(user_ids)}] 404: {user_id}")
-                elif result:
-                    self._save_json(user_id, result, save_empty)
-                    results.append({
-                        'user_id': result.get('userId', user_id),
-                        'user_name': result.get('userName', ''),
-                        'year': result.get('year', ''),
-                        'reason': result.get('reason', '')
-                    })
-                    print(f"[{i+1}/{len(user_ids)}] FOUND: {result.get('userName', 'Unknown')}")
-                else:
-                    if save_empty:
+                producer_task = asyncio.create_task(producer())
+                workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrent)]
+                
+                completed = 0
+                active_workers = len(workers)
+                while active_workers:
+                    item = await out_queue.get()
+                    if item is None:
+                        active_workers -= 1
+                        continue
+                    
+                    # Results arrive in completion order, so each carries its own user ID
+                    user_id, result = item
+                    completed += 1
+                    
+                    if result and result.get('_404'):
+                        new_404s.add(user_id)
+                        print(f"[{completed}/{len(user_ids)}] 404: {user_id}")
+                    elif result:
+                        self._save_json(user_id, result, save_empty)
                         results.append({
-                            'user_id': user_id,
-                            'user_name': '',
-                            'year': '',
-                            'reason': 'Not found'
+                            'user_id': result.get('userId', user_id),
+                            'user_name': result.get('userName', ''),
+                            'year': result.get('year', ''),
+                            'reason': result.get('reason', '')
                         })
-                    print(f"[{i+1}/{len(user_ids)}] Not found: {user_id}")
+                        print(f"[{completed}/{len(user_ids)}] FOUND: {result.get('userName', 'Unknown')}")
+                    else:
+                        if save_empty:
+                            results.append({
+                                'user_id': user_id,
+                                'user_name': '',
+                                'year': '',
+                                'reason': 'Not found'
+                            })
+                        print(f"[{completed}/{len(user_ids)}] Not found: {user_id}")
+                
+                producer_task.cancel()
+        
+        finally:
+            # Wait for pending JSON writes
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
         
         # Save results
         self._save_404s(new_404s)
@@ -6,15 +6,64 @@ Checks user IDs against the yoinker detection service and outputs results to CSV
 """
 
 import hashlib
+import heapq
+import logging
 import json
-import csv
 import asyncio
 import aiohttp
 import argparse
 import os
+import random
 import threading
-from datetime import datetime, timedelta, UTC
-from typing import Optional, Dict, Tuple, List
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Deque, Tuple, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # libuv-based event loop, not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+# Per-request details are logged at DEBUG, progress is printed once per batch
+logger = logging.getLogger("yoinker")
+logger.setLevel(logging.INFO)
+
+# Cached API results live for 30 minutes, at most 512 of them at a time
+CACHE_TTL_SECONDS = 30 * 60
+CACHE_MAX_SIZE = 512
+
+# Characters that force a CSV field to be quoted (';' is the delimiter)
+CSV_SPECIAL_CHARS = (';', '"', '\r', '\n')
+
+
+def _csv_field(value) -> bytes:
+    """Encode a CSV field, quoting it only when needed (like csv.QUOTE_MINIMAL)"""
+    text = '' if value is None else str(value)
+    if any(char in text for char in CSV_SPECIAL_CHARS):
+        text = '"' + text.replace('"', '""') + '"'
+    return text.encode('utf-8')
+
+
+def _write_csv_row(csvfile, fields: List) -> None:
+    """Write one ';'-delimited row to a binary file"""
+    csvfile.write(b';'.join([_csv_field(field) for field in fields]) + b'\r\n')
+
+
+# Marks a user that isn't in the result cache (cached results can be None)
+_MISS = object()
+
+# Attempts per user before check_user gives up
+MAX_ATTEMPTS = 4
+
+# Saved responses read per thread hop when answering IDs up front
+SAVED_READ_CHUNK = 256
 
 
 class RateLimiter:
@@ -23,26 +72,32 @@ class RateLimiter:
     def __init__(self, max_requests: int = 15, time_frame_seconds: int = 60):
         self.max_requests = max_requests
         self.time_frame_seconds = time_frame_seconds
-        self.requests: List[datetime] = []
+        self.requests: Deque[float] = deque()
         self._lock = threading.Lock()
     
+    def _evict_expired(self, now: float):
+        """Drop requests that have left the time frame (caller holds the lock)"""
+        cutoff_time = now - self.time_frame_seconds
+        while self.requests and self.requests[0] <= cutoff_time:
+            self.requests.popleft()
+    
     def request_made(self):
         with self._lock:
-            now = datetime.now(UTC)
+            now = time.monotonic()
+            self._evict_expired(now)
             self.requests.append(now)
-            if len(self.requests) > (self.max_requests + 25):
-                self.requests.pop(0)
     
     def is_rate_limit_exceeded(self) -> bool:
         with self._lock:
-            now = datetime.now(UTC)
-            cutoff_time = now - timedelta(seconds=self.time_frame_seconds)
-            recent_requests = [req for req in self.requests if req > cutoff_time]
-            return len(recent_requests) >= self.max_requests
+            self._evict_expired(time.monotonic())
+            return len(self.requests) >= self.max_requests
     
     async def wait_if_needed(self):
         while self.is_rate_limit_exceeded():
-            await asyncio.sleep(0.25)
+            # Sleep until the oldest request leaves the time frame
+            with self._lock:
+                delay = self.requests[0] + self.time_frame_seconds - time.monotonic() if self.requests else 0
+            await asyncio.sleep(max(delay, 0.01))
 
 
 class YoinkerDetector:
@@ -50,45 +105,105 @@ class YoinkerDetector:
     
     def __init__(self, max_concurrent: int = 5):
         self.rate_limiter = RateLimiter()
-        self.cache: Dict[str, Tuple[datetime, Optional[Dict]]] = {}
+        self.cache: OrderedDict[str, Tuple[float, Optional[Dict]]] = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._hash_cache: Dict[str, str] = {}
+        self._not_found: Optional[set] = None
+        self._not_found_lock = threading.Lock()
+        self._404_fh = None
+        self._404_queue: Optional[asyncio.Queue] = None
         self.base_url = "https://yd.just-h.party/"
         self.max_concurrent = max_concurrent
         self._cache_lock = threading.Lock()
-        self._last_request_time = datetime.now(UTC)
-        self._request_lock = threading.Lock()
+        self._sem = asyncio.Semaphore(max_concurrent)
+        self._existing_json: Optional[set] = None
+        self._session: Optional[aiohttp.ClientSession] = None
     
     def _generate_hash(self, user_id: str) -> str:
         """Generate SHA256 hash of user ID"""
-        return hashlib.sha256(user_id.encode('utf-8')).hexdigest()
+        user_hash = self._hash_cache.get(user_id)
+        if user_hash is None:
+            user_hash = hashlib.sha256(user_id.encode('utf-8')).hexdigest()
+        return user_hash
+    
+    def _evict_expired(self, now: float):
+        """Drop every expired cache entry (caller holds the cache lock)"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expiry, user_id = heapq.heappop(heap)
+            entry = self.cache.get(user_id)
+            # Skip heap entries whose key was refreshed or already evicted
+            if entry is not None and entry[0] + CACHE_TTL_SECONDS == expiry:
+                del self.cache[user_id]
     
-    def _check_cache(self, user_id: str) -> Optional[Dict]:
-        """Check if user ID is in cache and not expired"""
+    def _fast_lookup(self, user_id: str):
+        """Get a cached result (which may be None), or _MISS if the user isn't cached"""
         with self._cache_lock:
-            if user_id in self.cache:
-                cached_time, result = self.cache[user_id]
-                if datetime.now(UTC) - cached_time < timedelta(minutes=30):
-                    return result
-                else:
-                    del self.cache[user_id]
-            
-            if len(self.cache) > 512:
-                self.cache.clear()
-            
-            return None
+            self._evict_expired(time.monotonic())
+            entry = self.cache.get(user_id)
+            if entry is None:
+                return _MISS
+            self.cache.move_to_end(user_id)
+            return entry[1]
     
     def _add_to_cache(self, user_id: str, result: Optional[Dict]):
-        """Add result to cache"""
+        """Add result to cache, evicting expired and least recently used entries"""
         with self._cache_lock:
-            self.cache[user_id] = (datetime.now(UTC), result)
+            now = time.monotonic()
+            self._evict_expired(now)
+            self.cache[user_id] = (now, result)
+            self.cache.move_to_end(user_id)
+            heapq.heappush(self._expiry_heap, (now + CACHE_TTL_SECONDS, user_id))
+            while len(self.cache) > CACHE_MAX_SIZE:
+                self.cache.popitem(last=False)
+    
+    def _get_not_found_ids(self) -> set:
+        """Get the known 404 IDs, loading 404.txt on first use"""
+        with self._not_found_lock:
+            if self._not_found is None:
+                self._not_found = self._load_404_ids()
+            return self._not_found
     
     def _save_to_404_file(self, user_id: str):
-        """Save user ID to 404.txt file"""
+        """Save user ID to 404.txt file if it isn't there already"""
+        not_found = self._get_not_found_ids()
+        with self._not_found_lock:
+            if user_id in not_found:
+                return
+            not_found.add(user_id)
+            
+            # Hand off to the writer task while processing, otherwise write directly
+            if self._404_queue is not None:
+                self._404_queue.put_nowait(user_id)
+            else:
+                self._write_404_line(user_id)
+    
+    def _write_404_line(self, user_id: str):
+        """Append a user ID to 404.txt (caller holds the 404 lock)"""
         try:
-            with open("404.txt", "a", encoding="utf-8") as f:
-                f.write(f"{user_id}\n")
+            if self._404_fh is None:
+                self._404_fh = open("404.txt", "a", encoding="utf-8", buffering=1 << 16)
+            self._404_fh.write(f"{user_id}\n")
         except Exception as e:
             print(f"Error saving to 404.txt for {user_id}: {e}")
     
+    async def _404_writer_loop(self):
+        """Single consumer appending queued 404 IDs to 404.txt"""
+        while True:
+            user_id = await self._404_queue.get()
+            try:
+                with self._not_found_lock:
+                    self._write_404_line(user_id)
+            finally:
+                self._404_queue.task_done()
+    
+    def _close_404_file(self):
+        """Close the 404.txt append handle"""
+        with self._not_found_lock:
+            if self._404_fh is not None:
+                self._404_fh.close()
+                self._404_fh = None
+    
     def _load_404_ids(self) -> set:
         """Load existing 404 IDs from file"""
         if not os.path.exists("404.txt"):
@@ -101,143 +216,219 @@ class YoinkerDetector:
             print(f"Error reading 404.txt: {e}")
             return set()
     
-    def _save_json_response(self, user_id: str, response_data: Optional[Dict], save_empty: bool, yoinkers_dir: str):
+    async def _save_json_response(self, user_id: str, response_data: Optional[Dict], save_empty: bool, yoinkers_dir: str):
         """Save JSON response to file"""
         if not save_empty and not response_data:
             return
             
         try:
             json_file = os.path.join(yoinkers_dir, f"{user_id}.json")
-            with open(json_file, 'w', encoding='utf-8') as f:
-                if response_data:
-                    json.dump(response_data, f, indent=2, ensure_ascii=False)
-                else:
-                    json.dump({
-                        "userId": user_id,
-                        "userName": "",
-                        "isYoinker": False,
-                        "reason": "",
-                        "year": "",
-                        "status": "not_found"
-                    }, f, indent=2, ensure_ascii=False)
+            if not response_data:
+                response_data = {
+                    "userId": user_id,
+                    "userName": "",
+                    "isYoinker": False,
+                    "reason": "",
+                    "year": "",
+                    "status": "not_found"
+                }
+            
+            if orjson is not None:
+                payload = orjson.dumps(response_data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(response_data, indent=2, ensure_ascii=False).encode('utf-8')
+            
+            # Write off the event loop so pending requests keep being serviced
+            await asyncio.to_thread(self._write_file, json_file, payload)
+            if self._existing_json is not None:
+                self._existing_json.add(user_id)
         except Exception as e:
             print(f"Error saving JSON for {user_id}: {e}")
     
-    def _append_csv_result(self, user_id: str, result: Optional[Dict], save_empty: bool, output_file: str, csv_lock: threading.Lock, csv_initialized: List[bool]):
+    def _read_file(self, path: str) -> bytes:
+        """Read a file as bytes"""
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def _write_file(self, path: str, payload: bytes):
+        """Write bytes to a file"""
+        with open(path, 'wb') as f:
+            f.write(payload)
+    
+    def _append_csv_result(self, csvfile, user_id: str, result: Optional[Dict], save_empty: bool):
         """Append result to CSV file"""
-        with csv_lock:
-            try:
-                # Initialize CSV with header if not done yet
-                if not csv_initialized[0]:
-                    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.writer(csvfile, delimiter=';')
-                        writer.writerow(['UserId', 'UserName', 'Year', 'Reason'])
-                    csv_initialized[0] = True
+        try:
+            if result:
+                _write_csv_row(csvfile, [
+                    result.get('userId', user_id),
+                    result.get('userName', ''),
+                    result.get('year', ''),
+                    result.get('reason', '')
+                ])
+            elif save_empty:
+                _write_csv_row(csvfile, [user_id, '', '', 'Not found'])
                 
-                # Append result to CSV
-                with open(output_file, 'a', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile, delimiter=';')
-                    
-                    if result:
-                        writer.writerow([
-                            result.get('userId', user_id),
-                            result.get('userName', ''),
-                            result.get('year', ''),
-                            result.get('reason', '')
-                        ])
-                    elif save_empty:
-                        writer.writerow([user_id, '', '', 'Not found'])
-                        
-            except Exception as e:
-                print(f"Error writing to CSV for {user_id}: {e}")
-    
-    async def _ensure_minimum_delay(self):
-        """Ensure minimum 100ms delay between requests"""
-        now = datetime.now(UTC)
-        time_since_last = (now - self._last_request_time).total_seconds()
-        if time_since_last < 0.1:
-            await asyncio.sleep(0.1 - time_since_last)
-        self._last_request_time = datetime.now(UTC)
-    
-    async def check_user(self, session: aiohttp.ClientSession, user_id: str, yoinkers_dir: str = "yoinkers", retry_count: int = 0) -> Optional[Dict]:
+        except Exception as e:
+            print(f"Error writing to CSV for {user_id}: {e}")
+    
+    async def _csv_writer_loop(self, results_queue: asyncio.Queue, csvfile, save_empty: bool):
+        """Single consumer writing queued (user_id, result) pairs to the CSV file"""
+        while True:
+            user_id, result = await results_queue.get()
+            try:
+                self._append_csv_result(csvfile, user_id, result, save_empty)
+            finally:
+                results_queue.task_done()
+    
+    def _read_saved_response(self, user_id: str, yoinkers_dir: str):
+        """Read a saved JSON response without side effects, returning _MISS if it can't be read"""
+        json_file = os.path.join(yoinkers_dir, f"{user_id}.json")
+        try:
+            payload = self._read_file(json_file)
+            
+            # Most saved responses are negatives, spot those without parsing
+            if b'"isYoinker":true' not in payload.replace(b' ', b''):
+                return None
+            
+            data = orjson.loads(payload) if orjson is not None else json.loads(payload)
+            return data if data.get('isYoinker', False) else None
+        except Exception as e:
+            print(f"Error reading existing JSON for {user_id}: {e}")
+            return _MISS
+    
+    def _read_saved_responses(self, user_ids: List[str], yoinkers_dir: str) -> List:
+        """Read a chunk of saved JSON responses in one go"""
+        return [self._read_saved_response(user_id, yoinkers_dir) for user_id in user_ids]
+    
+    async def _load_saved_response(self, user_id: str, yoinkers_dir: str):
+        """Load a saved JSON response, returning _MISS if it can't be read"""
+        result = await asyncio.to_thread(self._read_saved_response, user_id, yoinkers_dir)
+        if result is None:
+            # Add to 404.txt if not already there
+            self._save_to_404_file(user_id)
+        return result
+    
+    async def check_user(self, session: aiohttp.ClientSession, user_id: str, yoinkers_dir: str = "yoinkers") -> Optional[Dict]:
         """Check a single user ID against the yoinker detection service"""
         
         # Check for existing JSON file first
         json_file = os.path.join(yoinkers_dir, f"{user_id}.json")
-        if os.path.exists(json_file):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data.get('isYoinker', False):
-                        return data
-                    else:
-                        # Add to 404.txt if not already there
-                        if user_id not in self._load_404_ids():
-                            self._save_to_404_file(user_id)
-                        return None
-            except Exception as e:
-                print(f"Error reading existing JSON for {user_id}: {e}")
+        if self._existing_json is None:
+            has_json = os.path.exists(json_file)
+        else:
+            has_json = user_id in self._existing_json
+        if has_json:
+            saved_result = await self._load_saved_response(user_id, yoinkers_dir)
+            if saved_result is not _MISS:
+                return saved_result
         
         # Check cache
-        cached_result = self._check_cache(user_id)
-        if cached_result is not None:
+        cached_result = self._fast_lookup(user_id)
+        if cached_result is not _MISS:
             return cached_result
         
         # Make API request with retry logic
-        print(f"Making API request for {user_id} (attempt {retry_count + 1}/4)")
-        await self.rate_limiter.wait_if_needed()
-        print(f"Rate limit check passed for {user_id}")
+        url = f"{self.base_url}{self._generate_hash(user_id)}"
+        timeout = aiohttp.ClientTimeout(total=10, connect=5)
         
-        try:
-            url = f"{self.base_url}{self._generate_hash(user_id)}"
-            timeout = aiohttp.ClientTimeout(total=10, connect=5)
-            async with session.get(url, timeout=timeout) as response:
-                self.rate_limiter.request_made()
-                
-                if response.status == 200:
-                    try:
-                        data = await response.json()
-                        if data.get('isYoinker', False):
-                            self._add_to_cache(user_id, data)
-                            return data
-                        else:
-                            self._add_to_cache(user_id, None)
-                            return None
-                    except json.JSONDecodeError:
-                        print(f"Invalid JSON response for user {user_id}")
-                        return None
-                
-                elif response.status == 404:
+        for attempt in range(MAX_ATTEMPTS):
+            logger.debug("Making API request for %s (attempt %d/%d)", user_id, attempt + 1, MAX_ATTEMPTS)
+            await self.rate_limiter.wait_if_needed()
+            logger.debug("Rate limit check passed for %s", user_id)
+            
+            try:
+                # Only the request itself holds a concurrency slot, retries wait outside it
+                async with self._sem:
+                    async with session.get(url, timeout=timeout) as response:
+                        self.rate_limiter.request_made()
+                        status = response.status
+                        data = None
+                        if status == 200:
+                            try:
+                                data = await response.json()
+                            except json.JSONDecodeError:
+                                print(f"Invalid JSON response for user {user_id}")
+                                return None
+            except asyncio.TimeoutError:
+                print(f"Timeout for user {user_id} (attempt {attempt + 1}/{MAX_ATTEMPTS})")
+                await self._backoff(attempt)
+                continue
+            except aiohttp.ClientError as e:
+                print(f"Request error for user {user_id} (attempt {attempt + 1}/{MAX_ATTEMPTS}): {e}")
+                await self._backoff(attempt)
+                continue
+            
+            if status == 200:
+                if data.get('isYoinker', False):
+                    self._add_to_cache(user_id, data)
+                    return data
+                else:
                     self._add_to_cache(user_id, None)
-                    self._save_to_404_file(user_id)
                     return None
-                
-                elif response.status == 429:
-                    print(f"Rate limited! Waiting...")
-                    await asyncio.sleep(60)
-                    return await self.check_user(session, user_id, yoinkers_dir, retry_count)
-                
-                else:
-                    print(f"Status {response.status} for user {user_id}, retrying...")
-                    await asyncio.sleep(1)
-                    return await self.check_user(session, user_id, yoinkers_dir, retry_count)
-                    
-        except asyncio.TimeoutError:
-            if retry_count < 3:
-                print(f"Timeout for user {user_id} (attempt {retry_count + 1}), retrying...")
-                await asyncio.sleep(1)  # Brief delay before retry
-                return await self.check_user(session, user_id, yoinkers_dir, retry_count + 1)
-            else:
-                print(f"Timeout for user {user_id} after 4 attempts, giving up")
+            
+            elif status == 404:
+                self._add_to_cache(user_id, None)
+                self._save_to_404_file(user_id)
                 return None
-        except aiohttp.ClientError as e:
-            if retry_count < 3:
-                print(f"Request error for user {user_id} (attempt {retry_count + 1}): {e}, retrying...")
-                await asyncio.sleep(1)  # Brief delay before retry
-                return await self.check_user(session, user_id, yoinkers_dir, retry_count + 1)
+            
+            elif status == 429:
+                # No point waiting out the limit if there's no attempt left to use it
+                if attempt < MAX_ATTEMPTS - 1:
+                    print(f"Rate limited! Waiting...")
+                    await asyncio.sleep(60 + random.uniform(0, 1))
+            
             else:
-                print(f"Request error for user {user_id} after 4 attempts: {e}")
-                return None
+                print(f"Status {status} for user {user_id}, retrying...")
+                await self._backoff(attempt)
+        
+        print(f"Giving up on user {user_id} after {MAX_ATTEMPTS} attempts")
+        return None
+    
+    async def _backoff(self, attempt: int):
+        """Sleep with exponential backoff and jitter before the next attempt"""
+        if attempt < MAX_ATTEMPTS - 1:
+            await asyncio.sleep(2 ** attempt + random.uniform(0, 1))
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            print("Creating HTTP session...")
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent * 2,
+                limit_per_host=self.max_concurrent,
+                keepalive_timeout=75,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={'User-Agent': 'YoinkerDetector Python Script'}
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session and the 404.txt handle"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        # check_user() calls outside process_user_ids write 404s straight to the buffered handle
+        self._close_404_file()
+    
+    async def _handle_result(self, user_id: str, result: Optional[Dict], save_empty: bool, yoinkers_dir: str, results_queue: asyncio.Queue, progress: str):
+        """Save a user's result to JSON and CSV and report it"""
+        await self._save_json_response(user_id, result, save_empty, yoinkers_dir)
+        results_queue.put_nowait((user_id, result))
+        
+        if result:
+            print(f"{progress} FOUND: {result.get('userName', 'Unknown')} - {result.get('reason', 'Unknown reason')}")
+        else:
+            logger.debug("%s Not found: %s", progress, user_id)
+    
+    @staticmethod
+    async def _wait_with_id(user_id: str, task: asyncio.Task) -> Tuple[str, asyncio.Task]:
+        """Wait for a task to finish and pair it with its user ID"""
+        await asyncio.wait([task])
+        return user_id, task
     
     async def process_user_ids(self, input_file: str, output_file: str, save_empty: bool = False):
         """Process user IDs from input file and write results to CSV"""
@@ -257,8 +448,9 @@ class YoinkerDetector:
         
         # Read and filter user IDs
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                user_ids = [line.strip() for line in f if line.strip()]
+            # Decode and split the whole file in one go, IDs never contain whitespace
+            with open(input_file, 'rb') as f:
+                user_ids = f.read().decode('utf-8').split()
         except Exception as e:
             print(f"Error reading input file: {e}")
             return
@@ -267,11 +459,17 @@ class YoinkerDetector:
             print("No user IDs found in input file!")
             return
         
+        # Drop repeated IDs, keeping first-seen order
+        unique_ids = list(dict.fromkeys(user_ids))
+        if len(unique_ids) < len(user_ids):
+            print(f"Removed {len(user_ids) - len(unique_ids)} duplicate IDs")
+        user_ids = unique_ids
+        
         print(f"Processing {len(user_ids)} user IDs...")
         
         # Load and filter 404 IDs
         print("Loading 404.txt file...")
-        not_found_ids = self._load_404_ids()
+        not_found_ids = self._get_not_found_ids()
         if not_found_ids:
             print(f"Loaded {len(not_found_ids)} IDs to skip from 404.txt")
         
@@ -289,63 +487,103 @@ class YoinkerDetector:
         
         print(f"Found {len(user_ids)} user IDs to check")
         
+        # List saved responses once instead of a stat per user
+        with os.scandir(yoinkers_dir) as entries:
+            self._existing_json = {entry.name[:-5] for entry in entries if entry.name.endswith('.json')}
+        
+        # Hash all IDs up front so requests only need a dict lookup
+        sha256 = hashlib.sha256
+        self._hash_cache = {uid: sha256(uid.encode('utf-8')).hexdigest() for uid in user_ids}
+        
         # Setup processing
         print("Setting up processing...")
-        csv_lock = threading.Lock()
-        csv_initialized = [False]
-        
-        # Process users with simpler approach
-        print("Creating HTTP session...")
-        connector = aiohttp.TCPConnector(limit=20, limit_per_host=3)
-        timeout = aiohttp.ClientTimeout(total=10)
+        csvfile = open(output_file, 'wb', buffering=1 << 20)
+        _write_csv_row(csvfile, ['UserId', 'UserName', 'Year', 'Reason'])
+        results_queue: asyncio.Queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._csv_writer_loop(results_queue, csvfile, save_empty))
+        self._404_queue = asyncio.Queue()
+        not_found_writer_task = asyncio.create_task(self._404_writer_loop())
         
-        async with aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers={'User-Agent': 'YoinkerDetector Python Script'}
-        ) as session:
+        try:
+            # Process users with simpler approach
+            session = await self._get_session()
             
             completed = 0
             found_count = 0
             
+            # Answer saved and cached IDs without creating tasks, reading saved responses
+            # a chunk per thread hop; only the rest need an API request
+            saved_ids = [uid for uid in user_ids if uid in self._existing_json]
+            answered = {}
+            for i in range(0, len(saved_ids), SAVED_READ_CHUNK):
+                chunk = saved_ids[i:i + SAVED_READ_CHUNK]
+                saved_results = await asyncio.to_thread(self._read_saved_responses, chunk, yoinkers_dir)
+                for user_id, result in zip(chunk, saved_results):
+                    if result is None:
+                        # Add to 404.txt if not already there
+                        self._save_to_404_file(user_id)
+                    answered[user_id] = result
+            
+            pending_ids = []
+            for user_id in user_ids:
+                result = answered.get(user_id, _MISS)
+                if result is _MISS:
+                    result = self._fast_lookup(user_id)
+                    if result is _MISS:
+                        # Unsaved, uncached, or the saved file couldn't be read (don't retry it)
+                        self._existing_json.discard(user_id)
+                        pending_ids.append(user_id)
+                        continue
+                completed += 1
+                await self._handle_result(user_id, result, save_empty, yoinkers_dir, results_queue, f"[{completed}/{len(user_ids)}]")
+                if result:
+                    found_count += 1
+            if completed:
+                print(f"Answered {completed} IDs from saved responses and cache, {found_count} found")
+            
             # Process users in smaller concurrent batches
             batch_size = self.max_concurrent * 2  # Process 2x concurrent users at a time
             
-            for i in range(0, len(user_ids), batch_size):
-                batch = user_ids[i:i + batch_size]
-                print(f"Processing batch {i//batch_size + 1}/{(len(user_ids) + batch_size - 1)//batch_size} ({len(batch)} users)")
+            for i in range(0, len(pending_ids), batch_size):
+                batch = pending_ids[i:i + batch_size]
+                print(f"Processing batch {i//batch_size + 1}/{(len(pending_ids) + batch_size - 1)//batch_size} ({len(batch)} users)")
                 
                 # Create tasks for this batch
-                print(f"Creating tasks for batch...")
                 tasks = []
                 for user_id in batch:
                     task = asyncio.create_task(self.check_user(session, user_id, yoinkers_dir))
                     tasks.append((user_id, task))
-                print(f"Created {len(tasks)} tasks, starting processing...")
+                logger.debug("Created %d tasks, starting processing...", len(tasks))
                 
-                # Process results as they complete
-                for i, (user_id, task) in enumerate(tasks):
+                # Process results in completion order so one slow user doesn't hold up the rest
+                for next_done in asyncio.as_completed([self._wait_with_id(user_id, task) for user_id, task in tasks]):
+                    user_id, task = await next_done
                     try:
-                        print(f"Waiting for task {i+1}/{len(tasks)}: {user_id}")
-                        result = await asyncio.wait_for(task, timeout=5)
+                        result = task.result()
                         completed += 1
-                        
-                        # Save results
-                        self._save_json_response(user_id, result, save_empty, yoinkers_dir)
-                        self._append_csv_result(user_id, result, save_empty, output_file, csv_lock, csv_initialized)
-                        
+                        await self._handle_result(user_id, result, save_empty, yoinkers_dir, results_queue, f"[{completed}/{len(user_ids)}]")
                         if result:
                             found_count += 1
-                            print(f"[{completed}/{len(user_ids)}] FOUND: {result.get('userName', 'Unknown')} - {result.get('reason', 'Unknown reason')}")
-                        else:
-                            print(f"[{completed}/{len(user_ids)}] Not found: {user_id}")
                             
-                    except asyncio.TimeoutError:
-                        print(f"Timeout for user {user_id}")
-                        completed += 1
                     except Exception as e:
                         print(f"Error processing user {user_id}: {e}")
                         completed += 1
+                
+                print(f"  {completed}/{len(user_ids)} processed, {found_count} found")
+            
+            # Wait for the writers to drain queued rows
+            await results_queue.join()
+            await self._404_queue.join()
+        finally:
+            writer_task.cancel()
+            not_found_writer_task.cancel()
+            # Write out 404s still queued (e.g. when cancelled) before closing the file
+            with self._not_found_lock:
+                while not self._404_queue.empty():
+                    self._write_404_line(self._404_queue.get_nowait())
+            self._404_queue = None
+            self._close_404_file()
+            csvfile.close()
         
         print(f"\nProcessing complete!")
         print(f"CSV results written to: {output_file}")
@@ -368,8 +606,14 @@ async def main():
     args = parser.parse_args()
     
     detector = YoinkerDetector(max_concurrent=args.concurrent)
-    await detector.process_user_ids(args.input_file, args.output, args.empty)
+    try:
+        await detector.process_user_ids(args.input_file, args.output, args.empty)
+    finally:
+        await detector.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file